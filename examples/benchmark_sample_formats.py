@@ -0,0 +1,44 @@
+import rtsa_py_wrapper as rpw
+import numpy as np
+import time
+
+NUM = 16_384
+SIZE = 2
+REPEAT = 200
+
+def throughput(func) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        func()
+    return NUM * REPEAT / (time.perf_counter() - start) / 1e6
+
+def snr(reference, restored) -> float:
+    noise = np.sum((reference - restored)**2)
+    return 10 * np.log10(np.sum(reference**2) / noise) if noise else np.inf
+
+def main():
+    rng = np.random.default_rng(0)
+    # noise floor with a strong burst, the case where block scaling matters
+    samples = rng.normal(0, 1e-3, (NUM, SIZE)).astype(np.float32)
+    samples[NUM//4:NUM//2] += rng.normal(0, 0.5, (NUM//4, SIZE)).astype(np.float32)
+
+    packet = rpw.AARTSAAPI_Packet(num=NUM, size=SIZE, stride=SIZE)
+    packet.fp32 = samples.ctypes.data_as(rpw.POINTER(rpw.c_float))
+    # creating the view is free, so time a pass over the data into a reused complex64 buffer
+    iq = np.empty(NUM * SIZE // 2, dtype=np.complex64).reshape(NUM, SIZE // 2)
+    rate = throughput(lambda: np.copyto(iq, packet.get_sample_as_complex64()))
+    print(f"{'complex64 copy':>16s} | {samples.nbytes:>10n} bytes | {'exact':>10s} | {rate:>10.1f} MS/s")
+
+    for dtype in (np.int16, np.int8):
+        quantizer = rpw.SampleQuantizer(dtype, block=64)
+        values = np.empty(samples.shape, dtype=dtype)
+        scales = np.empty(quantizer.num_blocks(NUM), dtype=np.float32)
+        restored = np.empty_like(samples)
+        rate = throughput(lambda: quantizer.quantize(samples, out=values, scales=scales))
+        back = throughput(lambda: quantizer.dequantize(values, scales, out=restored))
+        nbytes = values.nbytes + scales.nbytes
+        print(f"{np.dtype(dtype).name:>16s} | {nbytes:>10n} bytes | {snr(samples, restored):>7.1f} dB | {rate:>10.1f} MS/s | dequantize {back:>8.1f} MS/s")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 #!/usr/bin/env python
 
-import ctypes, time
+import ctypes, mmap, os, socket, stat, struct, threading, time
 import numpy as np
+from collections import deque
+from contextlib import contextmanager
 from typing import Self
 from ctypes import c_int, c_uint64, c_int64, c_uint32, c_int32, c_double, c_float, c_wchar, c_wchar_p, c_void_p, c_bool, POINTER, pointer, Structure, sizeof
 from enum import IntEnum
@@ -70,6 +72,15 @@ class AARTSAAPI_Wrapper_MemoryMode(PrintIntEnum):
     LARGE                       = 2
     LUDICRIOUS                  = 3
 
+class AARTSAAPI_Wrapper_StreamDropPolicy(PrintIntEnum):
+    DROP_OLDEST                 = 0
+    DROP_NEWEST                 = 1
+
+class AARTSAAPI_Wrapper_SampleFormat(PrintIntEnum):
+    FLOAT32                     = 0
+    INT16                       = 1
+    INT8                        = 2
+
 class AARTSAAPT_PacketFlags(PrintIntEnum):
     PACKET_DROP_WARN            = 0x200
     C0                          = 0x1000_0000
@@ -169,9 +180,61 @@ class AARTSAAPI_Packet(Structure):
         )
     
     def get_sample_as_ndarray(self) -> np.ndarray:
-        # return [[self.fp32[n*packet.size + s] for s in range(self.stride)] for n in range(self.num)]
-        # return self.fp32[:packet.size*packet.num]
-        return np.ctypeslib.as_array(self.fp32, (self.num, self.size))
+        """Returns a (num, size) view of the payload that skips the padding between samples"""
+        # a packet without stride information is packed
+        stride = self.stride or self.size
+        if stride < self.size:
+            raise ValueError(f"Cannot view packet with stride {stride} smaller than sample size {self.size}")
+        if self.num == 0:
+            return np.empty((0, self.size), dtype=np.float32)
+        if stride == self.size:
+            return np.ctypeslib.as_array(self.fp32, (self.num, self.size))
+        buffer = np.ctypeslib.as_array(self.fp32, ((self.num - 1) * stride + self.size,))
+        return np.lib.stride_tricks.as_strided(buffer,
+                                               shape=(self.num, self.size),
+                                               strides=(stride * buffer.itemsize, buffer.itemsize))
+
+    def get_time_axis(self) -> "LinearAxis":
+        """Returns the lazily evaluated start time of every sample"""
+        step = (self.endTime - self.startTime) / self.num if self.num else 0.0
+        return LinearAxis(self.startTime, step, self.num)
+
+    def get_frequency_axis(self) -> "LinearAxis":
+        """Returns the lazily evaluated frequency of every spectrum bin"""
+        return LinearAxis(self.startFrequency, self.stepFrequency, self.size)
+
+    def get_channel_count(self) -> int:
+        return max(self.interleave, 1)
+
+    def __channel_layout(self) -> tuple[int, int]:
+        channels = self.get_channel_count()
+        if self.size % channels:
+            raise ValueError(f"Cannot split sample size {self.size} into {channels} interleaved channels")
+        return channels, self.size // channels
+
+    def get_channels_as_ndarray(self) -> list[np.ndarray]:
+        """Returns one (num, size/interleave) view per channel; each sample holds the channels one after another"""
+        samples = self.get_sample_as_ndarray()
+        channels, width = self.__channel_layout()
+        return [samples[:, c*width:(c+1)*width] for c in range(channels)]
+
+    def deinterleave_channels(self, out=None) -> np.ndarray:
+        """Copies the channels into a contiguous (interleave, num, size/interleave) array, e.g. a reused buffer"""
+        channels, width = self.__channel_layout()
+        shape = (channels, self.num, width)
+        if out is None:
+            out = np.empty(shape, dtype=np.float32)
+        elif out.shape != shape or out.dtype != np.float32:
+            raise ValueError(f"Cannot deinterleave into {out.dtype} buffer of shape {out.shape}, need float32 {shape}")
+        samples = self.get_sample_as_ndarray().reshape(self.num, channels, width)
+        np.copyto(out, samples.transpose(1, 0, 2))
+        return out
+
+    def get_sample_as_complex64(self) -> np.ndarray:
+        """Returns the interleaved IQ payload as complex64 view of shape (num, size/2) without copying"""
+        if self.size % 2:
+            raise ValueError(f"Cannot view packet with odd sample size {self.size} as complex IQ")
+        return self.get_sample_as_ndarray().view(np.complex64)
 
 
 # Functions
@@ -288,6 +351,525 @@ def api(path):
     return librtsaapi
 
 
+# Signal Processing
+
+class Squelch:
+    """Energy detector that gates packets by their power with hysteresis and hangover.
+
+    With a fixed ``threshold`` (dB) the gate opens at or above it. Without one, the
+    threshold follows an adaptive noise floor (updated while closed) plus ``margin``.
+    The gate closes once the power falls ``hysteresis`` dB below the threshold and
+    ``hangover`` further packets have passed, so burst tails are not truncated.
+
+    By default the samples are linear IQ values. Set ``log_scale`` for spectrum packets
+    whose values are already in dBm; their bins are averaged in linear power.
+    """
+
+    def __init__(self,
+                 threshold=None,
+                 margin=10.0,
+                 hysteresis=3.0,
+                 hangover=0,
+                 subblocks=1,
+                 alpha=0.05,
+                 log_scale=False) -> None:
+        if hysteresis < 0:
+            raise ValueError(f"Squelch hysteresis must not be negative: {hysteresis}")
+        if hangover < 0:
+            raise ValueError(f"Squelch hangover must not be negative: {hangover}")
+        if subblocks < 1:
+            raise ValueError(f"Squelch needs at least one sub-block: {subblocks}")
+        if not 0 < alpha <= 1:
+            raise ValueError(f"Squelch noise floor alpha must be in (0, 1]: {alpha}")
+        self.__threshold = threshold
+        self.__margin = margin
+        self.__hysteresis = hysteresis
+        self.__hangover = hangover
+        self.__subblocks = subblocks
+        self.__alpha = alpha
+        self.__logScale = log_scale
+        self.__noiseFloor = None
+        self.__isOpen = False
+        self.__hangoverLeft = 0
+        self.__packetsTotal = 0
+        self.__packetsPassed = 0
+
+    def __row_energy(self, samples: np.ndarray) -> np.ndarray:
+        samples = samples.reshape(samples.shape[0], -1)
+        if self.__logScale:
+            return np.power(10, samples / 10, dtype=np.float64).mean(axis=1)
+        return np.einsum("ij,ij->i", samples, samples, dtype=np.float64)
+
+    def power(self, samples: np.ndarray) -> float:
+        """Returns the mean power in dB of the strongest sub-block of a (num, size) sample array"""
+        return self.power_batch([samples])[0]
+
+    def power_batch(self, batch: list[np.ndarray]) -> np.ndarray:
+        """Returns the power of several (num, size) sample arrays, -inf for empty ones.
+
+        Only the per-row energy is computed per array, since every packet lives in its own
+        driver buffer; splitting into sub-blocks, averaging and taking the strongest block
+        run once over the whole batch.
+        """
+        nums = np.array([samples.shape[0] if samples.size else 0 for samples in batch], dtype=np.int64)
+        powers = np.full(len(batch), -np.inf)
+        filled = np.flatnonzero(nums)
+        if filled.size == 0:
+            return powers
+        energy = np.concatenate([self.__row_energy(batch[i]) for i in filled])
+        nums = nums[filled]
+        offsets = np.cumsum(nums) - nums
+        blocks = np.minimum(nums, self.__subblocks)
+        first = np.cumsum(blocks) - blocks
+        packet = np.repeat(np.arange(filled.size), blocks)
+        k = np.arange(blocks.sum()) - first[packet]
+        starts = offsets[packet] + k * nums[packet] // blocks[packet]
+        lengths = np.diff(np.append(starts, energy.size))
+        block_power = np.add.reduceat(energy, starts) / lengths
+        strongest = np.maximum.reduceat(block_power, first)
+        powers[filled] = 10 * np.log10(strongest + np.finfo(np.float32).tiny)
+        return powers
+
+    def threshold(self) -> float:
+        if self.__threshold is not None:
+            return self.__threshold
+        if self.__noiseFloor is None:
+            return np.inf
+        return self.__noiseFloor + self.__margin
+
+    def update(self, power: float) -> bool:
+        """Feeds the power of the next packet and returns whether it passes the gate"""
+        # an empty packet must not seed the noise floor with -inf
+        if self.__threshold is None and self.__noiseFloor is None and np.isfinite(power):
+            self.__noiseFloor = power
+        threshold = self.threshold()
+        if power >= threshold:
+            self.__isOpen = True
+            self.__hangoverLeft = self.__hangover
+        elif self.__isOpen and power < threshold - self.__hysteresis:
+            if self.__hangoverLeft > 0:
+                self.__hangoverLeft -= 1
+            else:
+                self.__isOpen = False
+        if not self.__isOpen and self.__noiseFloor is not None and np.isfinite(power):
+            self.__noiseFloor += self.__alpha * (power - self.__noiseFloor)
+        self.__packetsTotal += 1
+        if self.__isOpen:
+            self.__packetsPassed += 1
+        return self.__isOpen
+
+    def process(self, packet: AARTSAAPI_Packet) -> bool:
+        return self.update(self.power(packet.get_sample_as_ndarray()))
+
+    def is_open(self) -> bool:
+        return self.__isOpen
+
+    def noise_floor(self) -> float | None:
+        return self.__noiseFloor
+
+    def duty_cycle(self) -> float:
+        """Returns the fraction of packets that passed the gate since the last reset"""
+        if self.__packetsTotal == 0:
+            return 0.0
+        return self.__packetsPassed / self.__packetsTotal
+
+    def get_stats(self) -> dict:
+        return {
+            "packetsTotal": self.__packetsTotal,
+            "packetsPassed": self.__packetsPassed,
+            "packetsDropped": self.__packetsTotal - self.__packetsPassed,
+            "dutyCycle": self.duty_cycle(),
+            "noiseFloor": self.__noiseFloor,
+            "threshold": self.threshold(),
+        }
+
+    def reset_stats(self) -> None:
+        self.__packetsTotal = 0
+        self.__packetsPassed = 0
+
+class SampleQuantizer:
+    """Scales float32 samples to int16/int8 with one float32 scale factor per block of rows.
+
+    Scratch memory is kept between calls and the results can be written into caller provided
+    buffers, so steady-state conversion does not allocate payload sized arrays.
+    """
+
+    def __init__(self, dtype=np.int16, block=64) -> None:
+        self.__dtype = np.dtype(dtype)
+        if self.__dtype not in (np.dtype(np.int16), np.dtype(np.int8)):
+            raise ValueError(f"Unsupported quantization type: {self.__dtype}")
+        if block < 1:
+            raise ValueError(f"Quantization block must be at least one row: {block}")
+        self.__block = block
+        self.__qmax = np.iinfo(self.__dtype).max
+        self.__work = np.empty(0, dtype=np.float32)
+
+    def __scratch(self, shape: tuple) -> np.ndarray:
+        size = int(np.prod(shape))
+        if self.__work.size < size:
+            self.__work = np.empty(size, dtype=np.float32)
+        return self.__work[:size].reshape(shape)
+
+    def __row_scales(self, scales: np.ndarray, rows: int) -> np.ndarray:
+        return np.repeat(scales, self.__block)[:rows, None]
+
+    def dtype(self) -> np.dtype:
+        return self.__dtype
+
+    def block(self) -> int:
+        return self.__block
+
+    def num_blocks(self, rows: int) -> int:
+        return -(-rows // self.__block)
+
+    def quantize(self, samples: np.ndarray, out=None, scales=None) -> tuple[np.ndarray, np.ndarray]:
+        """Quantizes a (num, size) sample array and returns the values and per-block scales"""
+        rows = samples.shape[0]
+        if out is None:
+            out = np.empty(samples.shape, dtype=self.__dtype)
+        if scales is None:
+            scales = np.empty(self.num_blocks(rows), dtype=np.float32)
+        if rows == 0:
+            return out, scales
+        work = self.__scratch(samples.shape)
+        np.abs(samples, out=work)
+        cols = work.size // rows
+        peaks = np.maximum.reduceat(work.reshape(-1), np.arange(0, rows, self.__block) * cols)
+        np.divide(peaks, self.__qmax, out=scales)
+        scales[scales == 0] = 1
+        np.multiply(samples, self.__row_scales(1 / scales, rows), out=work)
+        np.rint(work, out=work)
+        np.copyto(out, work, casting="unsafe")
+        return out, scales
+
+    def dequantize(self, values: np.ndarray, scales: np.ndarray, out=None) -> np.ndarray:
+        """Restores float32 samples from quantized values and their per-block scales"""
+        if out is None:
+            out = np.empty(values.shape, dtype=np.float32)
+        return np.multiply(values, self.__row_scales(scales, values.shape[0]), out=out)
+
+_index_ramp_cache = np.arange(0, dtype=np.float64)
+
+def _index_ramp(num: int) -> np.ndarray:
+    """Returns a shared read-only view of 0..num-1 that grows on demand"""
+    global _index_ramp_cache
+    if _index_ramp_cache.size < num:
+        _index_ramp_cache = np.arange(max(num, 2 * _index_ramp_cache.size), dtype=np.float64)
+        _index_ramp_cache.flags.writeable = False
+    return _index_ramp_cache[:num]
+
+
+class LinearAxis:
+    """Evenly spaced axis values start + n*step that are only computed on access"""
+
+    def __init__(self, start: float, step: float, num: int) -> None:
+        if num < 0:
+            raise ValueError(f"Axis length must not be negative: {num}")
+        self.start = start
+        self.step = step
+        self.num = num
+
+    def __len__(self) -> int:
+        return self.num
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            r = range(self.num)[key]
+            return self.start + self.step * np.arange(r.start, r.stop, r.step, dtype=np.float64)
+        return self.start + self.step * range(self.num)[key]
+
+    def __repr__(self) -> str:
+        return f"LinearAxis(start={self.start}, step={self.step}, num={self.num})"
+
+    def end(self) -> float:
+        return self.start + self.step * self.num
+
+    def index(self, value: float) -> int:
+        """Returns the index of the first value at or after value, clipped to [0, num]"""
+        if self.num == 0 or value <= self.start:
+            return 0
+        if np.isnan(value):
+            raise ValueError("Cannot look up NaN on an axis")
+        if self.step <= 0:
+            return self.num
+        position = (value - self.start) / self.step
+        # open ended ranges (inf) and values past the end clip before rounding
+        if not position < self.num:
+            return self.num
+        nearest = round(position)
+        # values that hit a sample up to rounding errors belong to it
+        if abs(position - nearest) > 1e-9 * max(1, abs(nearest)):
+            nearest = int(np.ceil(position))
+        return min(nearest, self.num)
+
+    def indices(self, start: float, stop: float) -> slice:
+        """Returns the slice of all samples with start <= value < stop"""
+        return slice(self.index(start), self.index(stop))
+
+    def to_ndarray(self, out=None) -> np.ndarray:
+        """Materializes the axis, into out if given to reuse a buffer"""
+        if out is None:
+            out = np.empty(self.num, dtype=np.float64)
+        elif out.shape != (self.num,):
+            raise ValueError(f"Cannot write axis of length {self.num} into buffer of shape {out.shape}")
+        np.multiply(_index_ramp(self.num), self.step, out=out)
+        out += self.start
+        return out
+
+
+class BatchAxis:
+    """Concatenation of the LinearAxis of consecutive packets, gaps between them are allowed"""
+
+    def __init__(self, axes: list[LinearAxis]) -> None:
+        starts = np.array([axis.start for axis in axes], dtype=np.float64)
+        if np.any(np.diff(starts) < 0):
+            raise ValueError("Batch axes must be ordered by their start value")
+        self.__axes = list(axes)
+        self.__starts = starts
+        self.__steps = np.array([axis.step for axis in axes], dtype=np.float64)
+        self.__offsets = np.cumsum([0] + [len(axis) for axis in axes])
+
+    @staticmethod
+    def time_axis_of(packets: list[AARTSAAPI_Packet]) -> "BatchAxis":
+        return BatchAxis([packet.get_time_axis() for packet in packets])
+
+    def __len__(self) -> int:
+        return int(self.__offsets[-1])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            r = range(len(self))[key]
+            index = np.arange(r.start, r.stop, r.step)
+        else:
+            index = np.int64(range(len(self))[key])
+        segment = np.searchsorted(self.__offsets, index, side="right") - 1
+        return self.__starts[segment] + self.__steps[segment] * (index - self.__offsets[segment])
+
+    def segment(self, index: int) -> int:
+        """Returns the number of the packet that holds the sample at index"""
+        return int(np.searchsorted(self.__offsets, range(len(self))[index], side="right") - 1)
+
+    def index(self, value: float) -> int:
+        """Returns the index of the first value at or after value; values in gaps map to the next packet"""
+        segment = int(np.searchsorted(self.__starts, value, side="right")) - 1
+        if segment < 0:
+            return 0
+        return int(self.__offsets[segment]) + self.__axes[segment].index(value)
+
+    def indices(self, start: float, stop: float) -> slice:
+        return slice(self.index(start), self.index(stop))
+
+    def to_ndarray(self, out=None) -> np.ndarray:
+        if out is None:
+            out = np.empty(len(self), dtype=np.float64)
+        elif out.shape != (len(self),):
+            raise ValueError(f"Cannot write axis of length {len(self)} into buffer of shape {out.shape}")
+        for axis, offset in zip(self.__axes, self.__offsets):
+            axis.to_ndarray(out[offset:offset + len(axis)])
+        return out
+
+_libc = None
+
+def _mlock(address: int, length: int, lock: bool) -> None:
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(None, use_errno=True)
+        _libc.mlock.argtypes = _libc.munlock.argtypes = [c_void_p, ctypes.c_size_t]
+    res = (_libc.mlock if lock else _libc.munlock)(address, length)
+    if res != 0:
+        errno = ctypes.get_errno()
+        raise RuntimeError(f"Failed to {'lock' if lock else 'unlock'} {length} bytes of memory: {os.strerror(errno)}")
+
+
+class BufferPool:
+    """Thread-safe pool of reusable float32 blocks and packet structs shared by all devices.
+
+    Blocks come in power-of-two size classes. Leased and cached blocks together stay within
+    the optional byte ``budget``: cached blocks of other classes are freed first, then acquire
+    waits until memory is released (or raises TimeoutError after ``timeout`` seconds).
+    Locked blocks are always page aligned and span whole pages, because mlock does not nest
+    and unlocking a shared page would also unlock a neighbouring block.
+    """
+
+    MIN_BLOCK = 1024
+
+    def __init__(self, budget=None, page_aligned=False, lock_memory=False) -> None:
+        if budget is not None and budget <= 0:
+            raise ValueError(f"Buffer pool budget must be positive: {budget}")
+        self.__budget = budget
+        self.__pageAligned = page_aligned or lock_memory
+        self.__lockMemory = lock_memory
+        self.__cond = threading.Condition()
+        self.__free = {}
+        self.__leased = {}
+        self.__packets = []
+        self.__pooledPackets = set()
+        self.__bytesAllocated = 0
+        self.__bytesInUse = 0
+        self.__highWater = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__waits = 0
+        self.__evictions = 0
+        self.__packetHits = 0
+        self.__packetMisses = 0
+
+    def __class_of(self, num: int) -> int:
+        return max(self.MIN_BLOCK, 1 << (num - 1).bit_length())
+
+    def __page_bytes(self, size_class: int) -> int:
+        return -(-size_class * sizeof(c_float) // mmap.PAGESIZE) * mmap.PAGESIZE
+
+    def __block_bytes(self, size_class: int) -> int:
+        if self.__pageAligned:
+            return self.__page_bytes(size_class) + mmap.PAGESIZE
+        return size_class * sizeof(c_float)
+
+    def __allocate(self, size_class: int) -> np.ndarray:
+        if self.__pageAligned:
+            raw = np.empty(self.__block_bytes(size_class), dtype=np.uint8)
+            offset = -raw.ctypes.data % mmap.PAGESIZE
+            block = raw[offset:offset + size_class * sizeof(c_float)].view(np.float32)
+        else:
+            block = np.empty(size_class, dtype=np.float32)
+        if self.__lockMemory:
+            _mlock(block.ctypes.data, self.__page_bytes(size_class), True)
+        return block
+
+    def __free_block(self, block: np.ndarray) -> None:
+        if self.__lockMemory:
+            _mlock(block.ctypes.data, self.__page_bytes(block.size), False)
+        self.__bytesAllocated -= self.__block_bytes(block.size)
+
+    def __evict(self, nbytes: int) -> None:
+        # drop cached blocks, largest classes first, until nbytes more fit into the budget
+        for size_class in sorted(self.__free, reverse=True):
+            blocks = self.__free[size_class]
+            while blocks and self.__bytesAllocated + nbytes > self.__budget:
+                self.__free_block(blocks.pop())
+                self.__evictions += 1
+
+    def __take(self, num: int, timeout) -> np.ndarray:
+        size_class = self.__class_of(num)
+        nbytes = self.__block_bytes(size_class)
+        if self.__budget is not None and nbytes > self.__budget:
+            raise ValueError(f"Cannot acquire {nbytes} bytes from buffer pool with budget {self.__budget}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited = False
+        with self.__cond:
+            while True:
+                if self.__free.get(size_class):
+                    self.__hits += 1
+                    block = self.__free[size_class].pop()
+                    break
+                if self.__budget is not None:
+                    self.__evict(nbytes)
+                if self.__budget is None or self.__bytesAllocated + nbytes <= self.__budget:
+                    self.__misses += 1
+                    block = self.__allocate(size_class)
+                    self.__bytesAllocated += nbytes
+                    self.__highWater = max(self.__highWater, self.__bytesAllocated)
+                    break
+                if not waited:
+                    self.__waits += 1
+                    waited = True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"Timed out waiting for {nbytes} bytes from buffer pool")
+                self.__cond.wait(remaining)
+            self.__bytesInUse += nbytes
+        return block
+
+    def acquire(self, shape, timeout=None) -> np.ndarray:
+        """Leases a float32 array of the given shape that has to be given back with release"""
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        num = int(np.prod(shape))
+        block = self.__take(max(num, 1), timeout)
+        array = block[:num].reshape(shape)
+        with self.__cond:
+            self.__leased[id(array)] = (array, block)
+        return array
+
+    def acquire_copy(self, samples: np.ndarray, timeout=None) -> np.ndarray:
+        """Leases an array and copies samples into it"""
+        array = self.acquire(samples.shape, timeout)
+        np.copyto(array, samples)
+        return array
+
+    def release(self, array: np.ndarray) -> None:
+        with self.__cond:
+            if id(array) not in self.__leased:
+                raise ValueError("Cannot release array that was not acquired from this buffer pool")
+            _, block = self.__leased.pop(id(array))
+            self.__bytesInUse -= self.__block_bytes(block.size)
+            self.__free.setdefault(block.size, []).append(block)
+            self.__cond.notify_all()
+
+    @contextmanager
+    def lease(self, shape, timeout=None):
+        array = self.acquire(shape, timeout)
+        try:
+            yield array
+        finally:
+            self.release(array)
+
+    def acquire_packet(self) -> AARTSAAPI_Packet:
+        with self.__cond:
+            if self.__packets:
+                self.__packetHits += 1
+                packet = self.__packets.pop()
+                self.__pooledPackets.remove(id(packet))
+                return packet
+            self.__packetMisses += 1
+        packet = AARTSAAPI_Packet()
+        packet.cbsize = sizeof(packet)
+        return packet
+
+    def release_packet(self, packet: AARTSAAPI_Packet) -> None:
+        """Returns a packet struct to the pool, together with its payload if that was leased here"""
+        payload = getattr(packet, "_payload", None)
+        if payload is not None:
+            packet._payload = None
+            with self.__cond:
+                leased = id(payload) in self.__leased
+            if leased:
+                self.release(payload)
+        with self.__cond:
+            if id(packet) in self.__pooledPackets:
+                raise ValueError("Cannot release packet that is already in the buffer pool")
+            self.__pooledPackets.add(id(packet))
+            self.__packets.append(packet)
+
+    def get_stats(self) -> dict:
+        with self.__cond:
+            return {
+                "budget": self.__budget,
+                "bytesAllocated": self.__bytesAllocated,
+                "bytesInUse": self.__bytesInUse,
+                "bytesCached": self.__bytesAllocated - self.__bytesInUse,
+                "highWater": self.__highWater,
+                "blocksInUse": len(self.__leased),
+                "hits": self.__hits,
+                "misses": self.__misses,
+                "waits": self.__waits,
+                "evictions": self.__evictions,
+                "packetsCached": len(self.__packets),
+                "packetHits": self.__packetHits,
+                "packetMisses": self.__packetMisses,
+            }
+
+    def clear(self) -> None:
+        """Frees all cached blocks and packets; leased blocks stay valid"""
+        with self.__cond:
+            for blocks in self.__free.values():
+                for block in blocks:
+                    self.__free_block(block)
+            self.__free.clear()
+            self.__packets.clear()
+            self.__pooledPackets.clear()
+            self.__cond.notify_all()
+
+
 # Wrapper Classes
 
 class DeviceWrapper:
@@ -296,7 +878,8 @@ class DeviceWrapper:
                  mAPTHandle, 
                  serialNumber, 
                  devMode, 
-                 devType=AARTSAAPI_Wrapper_DeviceType.SPECTRANV6) -> None:
+                 devType=AARTSAAPI_Wrapper_DeviceType.SPECTRANV6,
+                 bufferPool=None) -> None:
         self.__librtsaapi = librtsaapi
         self.__mAPIHandle = mAPTHandle
         self.__dHandle = AARTSAAPI_Device()
@@ -308,6 +891,10 @@ class DeviceWrapper:
         self.__isOpen = False
         self.__isConnected = False
         self.__isStarted = False
+        self.__squelch = None
+        self.__squelchPowers = deque()
+        self.__squelchPassed = False
+        self.__bufferPool = bufferPool
 
         self.__dHandle.cbsize = sizeof(self.__dHandle)
         self.__dpacket.cbsize = sizeof(self.__dpacket)
@@ -363,6 +950,8 @@ class DeviceWrapper:
         res = self.__librtsaapi.AARTSAAPI_ConsumePackets(pointer(self.__dHandle), channel, num)
         if res != AARTSAAPI_Result.OK:
             raise RuntimeError(f"Failed to consume packet num {num} on channel {channel}: {AARTSAAPI_Result(res)}")
+        # the head packet that passed the squelch is gone
+        self.__squelchPassed = False
         return num
 
     
@@ -377,6 +966,33 @@ class DeviceWrapper:
             else:
                 break
 
+    def __packet_skip_squelched(self, channel: c_int) -> bool:
+        # Peeks the queued packets in place, computes their power in one batch and drops the
+        # leading ones below the squelch in one call. Powers of packets behind the first one
+        # that passes are kept for the next call, so every packet is evaluated once.
+        # Returns whether a packet passed the squelch and is now first in the queue.
+        if self.__squelchPassed:
+            return True
+        available = self.__packet_available(channel).value
+        if available < len(self.__squelchPowers):
+            self.__squelchPowers.clear()
+        batch = []
+        for index in range(len(self.__squelchPowers), available):
+            self.__packet_get(channel, index, self.__dpacket, 0)
+            batch.append(self.__dpacket.get_sample_as_ndarray())
+        if batch:
+            self.__squelchPowers.extend(self.__squelch.power_batch(batch))
+        dropped = 0
+        passed = False
+        while self.__squelchPowers and not passed:
+            passed = self.__squelch.update(self.__squelchPowers.popleft())
+            if not passed:
+                dropped += 1
+        if dropped:
+            self.__packet_consume(channel, dropped)
+        self.__squelchPassed = passed
+        return passed
+
     def __config_root(self) -> AARTSAAPI_Config:
         config = AARTSAAPI_Config()
         res = self.__librtsaapi.AARTSAAPI_ConfigRoot(pointer(self.__dHandle), pointer(config))
@@ -589,16 +1205,83 @@ class DeviceWrapper:
     def get_packet(self, channel=0, wait_time=0, new=False) -> AARTSAAPI_Packet:
         if new:
             packet = self.__dpacket
+        elif self.__bufferPool is not None:
+            packet = self.__bufferPool.acquire_packet()
         else:
             packet = AARTSAAPI_Packet()
             packet.cbsize = sizeof(packet)
+        if self.__squelch is not None:
+            while not self.__packet_skip_squelched(channel):
+                if wait_time: time.sleep(wait_time/1000)
         self.__packet_get(channel, 0, packet, wait_time)
         self.__packet_consume(channel, 1)
         return packet
+
+    def poll_packet(self, callback, channel=0) -> bool:
+        """Hands the next packet to callback before it is consumed, while its payload is still valid.
+
+        Returns False without waiting if no packet (passing the squelch) is queued. The packet
+        struct is reused, so callback has to copy everything it wants to keep.
+        """
+        if self.__squelch is not None:
+            if not self.__packet_skip_squelched(channel):
+                return False
+        elif self.__packet_available(channel).value == 0:
+            return False
+        if self.__bufferPool is not None:
+            packet = self.__bufferPool.acquire_packet()
+        else:
+            packet = self.__dpacket
+        try:
+            self.__packet_get(channel, 0, packet, 0)
+            callback(packet)
+            self.__packet_consume(channel, 1)
+        finally:
+            if self.__bufferPool is not None:
+                self.__bufferPool.release_packet(packet)
+        return True
+
+    def get_packet_copy(self, channel=0, wait_time=0, timeout=None) -> AARTSAAPI_Packet:
+        """Returns a packet whose payload was copied before the packet was consumed.
+
+        With a buffer pool the struct and the payload come from the pool and are given back
+        together with BufferPool.release_packet; timeout limits the wait for pool memory.
+        """
+        copies = []
+        def copy(packet: AARTSAAPI_Packet) -> None:
+            samples = packet.get_sample_as_ndarray()
+            if self.__bufferPool is not None:
+                dst = self.__bufferPool.acquire_packet()
+                payload = self.__bufferPool.acquire_copy(samples, timeout)
+            else:
+                dst = AARTSAAPI_Packet()
+                payload = np.array(samples, dtype=np.float32, order="C")
+            pointer(dst)[0] = packet
+            dst.stride = dst.size
+            dst.fp32 = payload.ctypes.data_as(POINTER(c_float))
+            # keeps the payload alive as long as the packet that points into it
+            dst._payload = payload
+            copies.append(dst)
+        while not self.poll_packet(copy, channel):
+            if wait_time: time.sleep(wait_time/1000)
+        return copies[0]
             
+    def get_buffer_pool(self) -> BufferPool | None:
+        return self.__bufferPool
+
+    def set_squelch(self, squelch: Squelch | None) -> None:
+        """Installs a squelch that get_packet uses to drop idle packets; None disables it"""
+        self.__squelch = squelch
+        self.__squelchPowers.clear()
+        self.__squelchPassed = False
+
+    def get_squelch(self) -> Squelch | None:
+        return self.__squelch
+
     def flush_channel(self, channel=0) -> None:
         num = self.__packet_available(channel)
         self.__packet_consume(channel, num)
+        self.__squelchPowers.clear()
 
     def push_config(self, tree: dict):
         if 'calibration' in tree and 'calibrationreload' in tree['calibration']:
@@ -637,10 +1320,11 @@ class DeviceWrapper:
 
 class RTSAWrapper:
 
-    def __init__(self, memoryMode: AARTSAAPI_Wrapper_MemoryMode, path="/opt/aaronia-rtsa-suite/Aaronia-RTSA-Suite-PRO/libAaroniaRTSAAPI.so") -> None:
+    def __init__(self, memoryMode: AARTSAAPI_Wrapper_MemoryMode, path="/opt/aaronia-rtsa-suite/Aaronia-RTSA-Suite-PRO/libAaroniaRTSAAPI.so", bufferPool=None) -> None:
         self.__librtsaapi = api(path)
         self.__mAPIHandle = None
         self.__mDevices = None
+        self.__bufferPool = bufferPool if bufferPool is not None else BufferPool()
         self.memoryMode = memoryMode
 
     def __enter__(self) -> Self:
@@ -705,7 +1389,10 @@ class RTSAWrapper:
                            serialNumber, 
                            devMode, 
                            devType=AARTSAAPI_Wrapper_DeviceType.SPECTRANV6) -> DeviceWrapper:
-        return DeviceWrapper(self.__librtsaapi, self.__mAPIHandle, serialNumber, devMode, devType)
+        return DeviceWrapper(self.__librtsaapi, self.__mAPIHandle, serialNumber, devMode, devType, self.__bufferPool)
+
+    def get_buffer_pool(self) -> BufferPool:
+        return self.__bufferPool
 
     def get_Handle(self) -> AARTSAAPI_Handle:
         return self.__mAPIHandle
@@ -717,4 +1404,374 @@ class RTSAWrapper:
     def __exit__(self, exc_type, exc_value, exc_tb) -> None:
         self.__api_close()
         self.__mAPIHandle = None
-        self.__api_shutdown()
\ No newline at end of file
+        self.__api_shutdown()
+        self.__bufferPool.clear()
+
+
+# Streaming
+
+STREAM_MAGIC = b"RTSA"
+STREAM_VERSION = 2
+
+# magic, version, sample format, scale block, streamID, flags, startTime, endTime, startFrequency,
+# stepFrequency, spanFrequency, rbwFrequency, num, total, size, stride, interleave, payload bytes.
+# Quantized payloads start with one float32 scale per block followed by the samples.
+_stream_header = struct.Struct("<4sIIqQQddddddqqqqqQ")
+
+def _stream_socket(address) -> socket.socket:
+    """Creates a Unix socket for path addresses and a TCP socket for (host, port) tuples"""
+    if isinstance(address, (str, bytes, os.PathLike)):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock = socket.socket(socket.AF_INET6 if ":" in address[0] else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+def _stream_socket_id(path) -> tuple | None:
+    """Returns (device, inode) of the Unix socket file at path, None if there is no socket file"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if not stat.S_ISSOCK(st.st_mode):
+        return None
+    return (st.st_dev, st.st_ino)
+
+def _stream_recv_into(sock: socket.socket, view: memoryview) -> None:
+    while len(view):
+        n = sock.recv_into(view)
+        if n == 0:
+            raise ConnectionError("Stream closed by server")
+        view = view[n:]
+
+
+class _StreamSubscriber:
+    def __init__(self, sock: socket.socket, peer, queue_size: int, drop_policy: AARTSAAPI_Wrapper_StreamDropPolicy) -> None:
+        self.__sock = sock
+        self.__peer = peer
+        self.__queue = deque()
+        self.__queueSize = queue_size
+        self.__dropPolicy = drop_policy
+        self.__cond = threading.Condition()
+        self.__isClosed = False
+        self.__connectTime = time.monotonic()
+        self.__packetsSent = 0
+        self.__packetsDropped = 0
+        self.__bytesSent = 0
+        self.__latencySum = 0.0
+        self.__latencyMax = 0.0
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def __send(self, buffers: list) -> None:
+        # scatter-gather send straight from the header and payload buffers
+        views = [view for view in buffers if len(view)]
+        while views:
+            n = self.__sock.sendmsg(views)
+            self.__bytesSent += n
+            while n:
+                if n >= len(views[0]):
+                    n -= len(views[0])
+                    views.pop(0)
+                else:
+                    views[0] = views[0][n:]
+                    n = 0
+
+    def __run(self) -> None:
+        while True:
+            with self.__cond:
+                while not self.__queue and not self.__isClosed:
+                    self.__cond.wait()
+                if self.__isClosed:
+                    break
+                header, payload, timestamp = self.__queue.popleft()
+            try:
+                self.__send([memoryview(header), payload])
+            except OSError:
+                break
+            latency = time.monotonic() - timestamp
+            self.__packetsSent += 1
+            self.__latencySum += latency
+            self.__latencyMax = max(self.__latencyMax, latency)
+        self.close()
+
+    def offer(self, frame: tuple) -> None:
+        with self.__cond:
+            if len(self.__queue) >= self.__queueSize:
+                self.__packetsDropped += 1
+                if self.__dropPolicy == AARTSAAPI_Wrapper_StreamDropPolicy.DROP_NEWEST:
+                    return
+                self.__queue.popleft()
+            self.__queue.append(frame)
+            self.__cond.notify()
+
+    def is_closed(self) -> bool:
+        return self.__isClosed
+
+    def close(self) -> None:
+        with self.__cond:
+            if self.__isClosed:
+                return
+            self.__isClosed = True
+            self.__queue.clear()
+            self.__cond.notify()
+        try:
+            self.__sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.__sock.close()
+
+    def join(self, timeout=None) -> None:
+        self.__thread.join(timeout)
+
+    def get_stats(self) -> dict:
+        elapsed = max(time.monotonic() - self.__connectTime, 1e-9)
+        return {
+            "peer": self.__peer,
+            "queued": len(self.__queue),
+            "packetsSent": self.__packetsSent,
+            "packetsDropped": self.__packetsDropped,
+            "bytesSent": self.__bytesSent,
+            "packetRate": self.__packetsSent / elapsed,
+            "byteRate": self.__bytesSent / elapsed,
+            "latencyMean": self.__latencySum / self.__packetsSent if self.__packetsSent else 0.0,
+            "latencyMax": self.__latencyMax,
+        }
+
+
+class PacketStreamServer:
+    """Publishes the packets of one device channel to any number of TCP or Unix socket subscribers.
+
+    Every packet is snapshotted once when it is taken from the device and the same buffer is
+    sent to all subscribers. Each subscriber has its own bounded queue, so a slow subscriber
+    only drops its own packets according to the drop policy.
+    """
+
+    def __init__(self,
+                 device: DeviceWrapper,
+                 address,
+                 channel=0,
+                 queue_size=64,
+                 drop_policy=AARTSAAPI_Wrapper_StreamDropPolicy.DROP_OLDEST,
+                 sample_format=AARTSAAPI_Wrapper_SampleFormat.FLOAT32,
+                 scale_block=64,
+                 poll_time=1) -> None:
+        if queue_size < 1:
+            raise ValueError(f"Stream queue size must be at least 1: {queue_size}")
+        self.__device = device
+        self.__address = address
+        self.__channel = channel
+        self.__queueSize = queue_size
+        self.__dropPolicy = AARTSAAPI_Wrapper_StreamDropPolicy(drop_policy)
+        self.__sampleFormat = AARTSAAPI_Wrapper_SampleFormat(sample_format)
+        self.__quantizer = None
+        if self.__sampleFormat == AARTSAAPI_Wrapper_SampleFormat.INT16:
+            self.__quantizer = SampleQuantizer(np.int16, scale_block)
+        elif self.__sampleFormat == AARTSAAPI_Wrapper_SampleFormat.INT8:
+            self.__quantizer = SampleQuantizer(np.int8, scale_block)
+        self.__pollTime = poll_time
+        self.__sock = None
+        self.__subscribers = []
+        self.__lock = threading.Lock()
+        self.__stopEvent = threading.Event()
+        self.__error = None
+        self.__socketId = None
+        self.__threads = []
+        self.__startTime = None
+        self.__packetsIn = 0
+
+    def __enter__(self) -> Self:
+        self.__sock = _stream_socket(self.__address)
+        if self.__sock.family == socket.AF_UNIX:
+            # replace a stale socket file, but never any other kind of file
+            if _stream_socket_id(self.__address) is not None:
+                os.unlink(self.__address)
+        else:
+            self.__sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__sock.bind(self.__address)
+        if self.__sock.family == socket.AF_UNIX:
+            self.__socketId = _stream_socket_id(self.__address)
+        self.__sock.listen()
+        self.__sock.settimeout(0.1)
+        self.__startTime = time.monotonic()
+        self.__stopEvent.clear()
+        self.__threads = [threading.Thread(target=self.__accept_loop, daemon=True)]
+        if self.__device is not None:
+            self.__device.start()
+            self.__threads.append(threading.Thread(target=self.__acquire_loop, daemon=True))
+        for thread in self.__threads:
+            thread.start()
+        return self
+
+    def __accept_loop(self) -> None:
+        while not self.__stopEvent.is_set():
+            try:
+                sock, peer = self.__sock.accept()
+            except TimeoutError:
+                continue
+            except OSError:
+                break
+            sock.settimeout(None)
+            subscriber = _StreamSubscriber(sock, peer, self.__queueSize, self.__dropPolicy)
+            with self.__lock:
+                self.__subscribers.append(subscriber)
+
+    def __acquire_loop(self) -> None:
+        try:
+            while not self.__stopEvent.is_set():
+                if not self.__device.poll_packet(self.publish, self.__channel):
+                    time.sleep(self.__pollTime/1000)
+        except Exception as e:
+            # surfaced by get_stats and __exit__, the server stops accepting subscribers
+            self.__error = e
+            self.__stopEvent.set()
+
+    def address(self):
+        """Returns the bound address, e.g. to find the port when binding to port 0"""
+        return self.__sock.getsockname()
+
+    def publish(self, packet: AARTSAAPI_Packet) -> None:
+        """Sends a packet to all subscribers; called by the acquisition thread for device packets"""
+        self.__packetsIn += 1
+        with self.__lock:
+            self.__subscribers = [sub for sub in self.__subscribers if not sub.is_closed()]
+            subscribers = list(self.__subscribers)
+        if not subscribers:
+            return
+        # The device reuses the packet memory once it is consumed, so take one snapshot for all
+        samples = packet.get_sample_as_ndarray()
+        if self.__quantizer is None:
+            scaleBlock = 0
+            payload = np.array(samples, dtype=np.float32, order="C")
+        else:
+            scaleBlock = self.__quantizer.block()
+            nscales = self.__quantizer.num_blocks(samples.shape[0])
+            itemsize = self.__quantizer.dtype().itemsize
+            payload = np.empty(nscales * sizeof(c_float) + samples.size * itemsize, dtype=np.uint8)
+            self.__quantizer.quantize(
+                samples,
+                out=payload[nscales * sizeof(c_float):].view(self.__quantizer.dtype()).reshape(samples.shape),
+                scales=payload[:nscales * sizeof(c_float)].view(np.float32))
+        header = _stream_header.pack(
+            STREAM_MAGIC,
+            STREAM_VERSION,
+            self.__sampleFormat,
+            scaleBlock,
+            packet.streamID,
+            packet.flags,
+            packet.startTime,
+            packet.endTime,
+            packet.startFrequency,
+            packet.stepFrequency,
+            packet.spanFrequency,
+            packet.rbwFrequency,
+            packet.num,
+            packet.total,
+            packet.size,
+            packet.size,
+            packet.interleave,
+            payload.nbytes)
+        frame = (header, memoryview(payload.reshape(-1).view(np.uint8)), time.monotonic())
+        for subscriber in subscribers:
+            subscriber.offer(frame)
+
+    def get_stats(self) -> dict:
+        if self.__error is not None:
+            raise self.__error
+        with self.__lock:
+            subscribers = [sub.get_stats() for sub in self.__subscribers if not sub.is_closed()]
+        elapsed = max(time.monotonic() - self.__startTime, 1e-9) if self.__startTime else 0.0
+        return {
+            "packetsIn": self.__packetsIn,
+            "packetRate": self.__packetsIn / elapsed if elapsed else 0.0,
+            "subscribers": subscribers,
+        }
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        self.__stopEvent.set()
+        for thread in self.__threads:
+            thread.join()
+        self.__sock.close()
+        with self.__lock:
+            subscribers, self.__subscribers = self.__subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+            subscriber.join()
+        # only remove the socket file if it is still the one this server created
+        if self.__socketId is not None and _stream_socket_id(self.__address) == self.__socketId:
+            os.unlink(self.__address)
+        self.__socketId = None
+        if self.__error is not None and exc_type is None:
+            raise self.__error
+
+
+class PacketStreamClient:
+    """Receives packets from a PacketStreamServer as AARTSAAPI_Packet structs backed by numpy buffers"""
+
+    def __init__(self, address, timeout=None) -> None:
+        self.__address = address
+        self.__timeout = timeout
+        self.__sock = None
+        self.__header = bytearray(_stream_header.size)
+        self.__buffer = np.empty(0, dtype=np.uint8)
+        self.__quantizers = {}
+
+    def __enter__(self) -> Self:
+        self.__sock = _stream_socket(self.__address)
+        self.__sock.settimeout(self.__timeout)
+        self.__sock.connect(self.__address)
+        return self
+
+    def get_packet(self) -> AARTSAAPI_Packet:
+        _stream_recv_into(self.__sock, memoryview(self.__header))
+        (magic, version, sampleFormat, scaleBlock, streamID, flags, startTime, endTime, startFrequency, stepFrequency,
+         spanFrequency, rbwFrequency, num, total, size, stride, interleave, payloadBytes) = _stream_header.unpack(self.__header)
+        if magic != STREAM_MAGIC or version != STREAM_VERSION:
+            raise RuntimeError(f"Received invalid stream frame: magic {magic!r}, version {version}")
+        sampleFormat = AARTSAAPI_Wrapper_SampleFormat(sampleFormat)
+        if sampleFormat == AARTSAAPI_Wrapper_SampleFormat.FLOAT32:
+            if payloadBytes != num * size * sizeof(c_float):
+                raise RuntimeError(f"Received stream frame with {payloadBytes} payload bytes for {num}x{size} samples")
+            payload = np.empty((num, size), dtype=np.float32)
+            _stream_recv_into(self.__sock, memoryview(payload.reshape(-1).view(np.uint8)))
+        else:
+            payload = self.__receive_quantized(sampleFormat, scaleBlock, num, size, payloadBytes)
+        packet = AARTSAAPI_Packet(
+            cbsize=sizeof(AARTSAAPI_Packet),
+            streamID=streamID,
+            flags=flags,
+            startTime=startTime,
+            endTime=endTime,
+            startFrequency=startFrequency,
+            stepFrequency=stepFrequency,
+            spanFrequency=spanFrequency,
+            rbwFrequency=rbwFrequency,
+            num=num,
+            total=total,
+            size=size,
+            stride=stride,
+            fp32=payload.ctypes.data_as(POINTER(c_float)),
+            interleave=interleave)
+        # keeps the payload alive as long as the packet that points into it
+        packet._payload = payload
+        return packet
+
+    def __receive_quantized(self, sampleFormat, scaleBlock, num, size, payloadBytes) -> np.ndarray:
+        key = (sampleFormat, scaleBlock)
+        if key not in self.__quantizers:
+            dtype = np.int16 if sampleFormat == AARTSAAPI_Wrapper_SampleFormat.INT16 else np.int8
+            self.__quantizers[key] = SampleQuantizer(dtype, scaleBlock)
+        quantizer = self.__quantizers[key]
+        scalesBytes = quantizer.num_blocks(num) * sizeof(c_float)
+        if payloadBytes != scalesBytes + num * size * quantizer.dtype().itemsize:
+            raise RuntimeError(f"Received {sampleFormat} stream frame with {payloadBytes} payload bytes for {num}x{size} samples")
+        # the receive buffer is reused, only the dequantized samples are handed out
+        if self.__buffer.size < payloadBytes:
+            self.__buffer = np.empty(payloadBytes, dtype=np.uint8)
+        buffer = self.__buffer[:payloadBytes]
+        _stream_recv_into(self.__sock, memoryview(buffer))
+        scales = buffer[:scalesBytes].view(np.float32)
+        values = buffer[scalesBytes:].view(quantizer.dtype()).reshape(num, size)
+        return quantizer.dequantize(values, scales)
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> None:
+        self.__sock.close()
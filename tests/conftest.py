@@ -0,0 +1,54 @@
+import ctypes
+
+import numpy as np
+import pytest
+
+import rtsa_py_wrapper as rpw
+
+
+class FakeLib:
+    """Stands in for the RTSA library with one queue of packets per channel"""
+
+    def __init__(self, payloads) -> None:
+        self.queue = [np.ascontiguousarray(p, dtype=np.float32) for p in payloads]
+        self.consumed = []
+        self.consume_calls = []
+        self.get_calls = 0
+
+    def AARTSAAPI_AvailPackets(self, device, channel, num):
+        num.contents.value = len(self.queue)
+        return rpw.AARTSAAPI_Result.OK
+
+    def AARTSAAPI_GetPacket(self, device, channel, index, packet):
+        if index >= len(self.queue):
+            return rpw.AARTSAAPI_Result.EMPTY
+        self.get_calls += 1
+        samples = self.queue[index]
+        packet = packet.contents
+        packet.streamID = id(samples) & 0xFFFF
+        packet.num = samples.shape[0]
+        packet.total = samples.shape[0]
+        packet.size = samples.shape[1]
+        packet.stride = samples.shape[1]
+        packet.interleave = 1
+        packet.fp32 = samples.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        return rpw.AARTSAAPI_Result.OK
+
+    def AARTSAAPI_ConsumePackets(self, device, channel, num):
+        num = int(num)
+        self.consume_calls.append(num)
+        # keep consumed payloads alive, like the driver ring buffer
+        self.consumed.extend(self.queue[:num])
+        del self.queue[:num]
+        return rpw.AARTSAAPI_Result.OK
+
+
+@pytest.fixture
+def fake_device():
+    def make(payloads, bufferPool=None) -> tuple[rpw.DeviceWrapper, FakeLib]:
+        lib = FakeLib(payloads)
+        device = rpw.DeviceWrapper(lib, rpw.AARTSAAPI_Handle(), "fake",
+                                   rpw.AARTSAAPI_Wrapper_DeviceMode.IQRECEIVER,
+                                   bufferPool=bufferPool)
+        return device, lib
+    return make
@@ -0,0 +1,55 @@
+import mmap
+
+import pytest
+
+import rtsa_py_wrapper as rpw
+
+
+def pool_bytes(blocks: int) -> int:
+    return blocks * rpw.BufferPool.MIN_BLOCK * 4
+
+
+def test_release_packet_twice_is_rejected():
+    pool = rpw.BufferPool()
+    packet = pool.acquire_packet()
+    pool.release_packet(packet)
+    with pytest.raises(ValueError):
+        pool.release_packet(packet)
+    assert pool.acquire_packet() is packet
+    assert pool.acquire_packet() is not packet
+    stats = pool.get_stats()
+    assert (stats["packetHits"], stats["packetMisses"]) == (1, 2)
+    assert (stats["hits"], stats["misses"]) == (0, 0)
+
+
+def test_release_packet_releases_pooled_payload():
+    pool = rpw.BufferPool()
+    packet = pool.acquire_packet()
+    packet._payload = pool.acquire((10, 2))
+    assert pool.get_stats()["blocksInUse"] == 1
+    pool.release_packet(packet)
+    assert pool.get_stats()["blocksInUse"] == 0
+
+
+def test_locked_blocks_are_page_aligned():
+    pool = rpw.BufferPool(lock_memory=True)
+    try:
+        block = pool.acquire(10)
+    except RuntimeError as e:
+        pytest.skip(f"mlock not permitted: {e}")
+    assert block.ctypes.data % mmap.PAGESIZE == 0
+    pool.release(block)
+    pool.clear()
+
+
+def test_budget_timeout():
+    pool = rpw.BufferPool(budget=pool_bytes(2))
+    first = pool.acquire(rpw.BufferPool.MIN_BLOCK)
+    second = pool.acquire(rpw.BufferPool.MIN_BLOCK)
+    with pytest.raises(TimeoutError):
+        pool.acquire(1, timeout=0.01)
+    pool.release(first)
+    third = pool.acquire(1, timeout=0.01)
+    assert pool.get_stats()["hits"] == 1
+    pool.release(second)
+    pool.release(third)
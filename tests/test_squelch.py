@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+import rtsa_py_wrapper as rpw
+
+
+def iq(num: int, amplitude: float) -> np.ndarray:
+    return np.full((num, 2), amplitude, dtype=np.float32)
+
+
+def test_hysteresis():
+    squelch = rpw.Squelch(threshold=0.0, hysteresis=3.0)
+    assert squelch.update(1.0)
+    assert squelch.update(-2.0)
+    assert not squelch.update(-4.0)
+    assert not squelch.update(-1.0)
+
+
+def test_hangover_keeps_gate_open():
+    squelch = rpw.Squelch(threshold=0.0, hysteresis=0.0, hangover=2)
+    assert [squelch.update(p) for p in (1.0, -10.0, -10.0, -10.0, -10.0)] == [True, True, True, False, False]
+    stats = squelch.get_stats()
+    assert (stats["packetsTotal"], stats["packetsPassed"], stats["packetsDropped"]) == (5, 3, 2)
+    assert squelch.duty_cycle() == pytest.approx(0.6)
+
+
+def test_adaptive_noise_floor_seeding_and_tracking():
+    squelch = rpw.Squelch(margin=10.0, alpha=0.5)
+    assert not squelch.update(-np.inf)
+    assert squelch.noise_floor() is None
+    assert not squelch.update(-50.0)
+    assert squelch.noise_floor() == -50.0
+    assert not squelch.update(-48.0)
+    assert squelch.noise_floor() == pytest.approx(-49.0)
+    assert squelch.threshold() == pytest.approx(-39.0)
+    assert squelch.update(-30.0)
+    # the floor is frozen while the gate is open
+    assert squelch.noise_floor() == pytest.approx(-49.0)
+
+
+def test_log_scale_for_dbm_spectra():
+    squelch = rpw.Squelch(log_scale=True)
+    noise = np.full((1, 100), -100.0, dtype=np.float32)
+    signal = np.full((1, 100), -40.0, dtype=np.float32)
+    assert squelch.power(signal) == pytest.approx(-40.0, abs=1e-3)
+    assert not any(squelch.update(squelch.power(noise)) for _ in range(5))
+    assert squelch.update(squelch.power(signal))
+
+
+def test_power_of_strongest_subblock():
+    samples = iq(100, 0.0)
+    samples[40:50] = 1.0
+    assert rpw.Squelch(subblocks=10).power(samples) == pytest.approx(10 * np.log10(2.0), abs=1e-4)
+    assert rpw.Squelch(subblocks=1).power(samples) == pytest.approx(10 * np.log10(0.2), abs=1e-4)
+
+
+def test_power_batch_matches_single_packets():
+    rng = np.random.default_rng(0)
+    batch = [rng.normal(size=(n, 2)).astype(np.float32) for n in (7, 0, 100, 3)]
+    batch.append(np.empty((5, 0), dtype=np.float32))
+    squelch = rpw.Squelch(subblocks=4)
+    powers = squelch.power_batch(batch)
+    assert powers[1] == -np.inf and powers[4] == -np.inf
+    for samples, power in zip(batch, powers):
+        if samples.size:
+            energy = (samples.astype(np.float64)**2).sum(axis=1)
+            blocks = np.array_split(energy, min(4, len(energy)))
+            expected = 10 * np.log10(max(block.mean() for block in blocks))
+            assert power == pytest.approx(expected, abs=1e-4)
+
+
+def test_get_packet_drops_idle_packets_in_one_call(fake_device):
+    payloads = [iq(10, 0.01)] * 10 + [iq(10, 1.0)] * 2 + [iq(10, 0.01)] * 5
+    device, lib = fake_device(payloads)
+    squelch = rpw.Squelch(threshold=-10.0, hysteresis=0.0, hangover=1)
+    device.set_squelch(squelch)
+    passed = [device.get_packet().get_sample_as_ndarray()[0, 0] for _ in range(3)]
+    assert passed == pytest.approx([1.0, 1.0, 0.01])
+    assert lib.consume_calls == [10, 1, 1, 1]
+    # every queued packet was evaluated exactly once
+    assert squelch.get_stats()["packetsTotal"] == 17
+    assert lib.get_calls == 17 + 3
+
+
+def test_empty_packets_are_dropped(fake_device):
+    device, lib = fake_device([np.empty((0, 2))] * 2 + [iq(10, 1.0)])
+    device.set_squelch(rpw.Squelch(threshold=-10.0))
+    assert device.get_packet().num == 10
+    assert lib.consume_calls == [2, 1]
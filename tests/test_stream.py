@@ -0,0 +1,148 @@
+import os
+import socket
+import time
+
+import numpy as np
+import pytest
+
+import rtsa_py_wrapper as rpw
+from ctypes import POINTER, c_float, sizeof
+
+
+def make_packet(samples: np.ndarray, streamID=0) -> rpw.AARTSAAPI_Packet:
+    packet = rpw.AARTSAAPI_Packet(
+        cbsize=sizeof(rpw.AARTSAAPI_Packet),
+        streamID=streamID,
+        startTime=1.0,
+        endTime=2.0,
+        startFrequency=100e6,
+        stepFrequency=1e3,
+        num=samples.shape[0],
+        total=samples.shape[0],
+        size=samples.shape[1],
+        stride=samples.shape[1],
+        interleave=1)
+    packet.fp32 = samples.ctypes.data_as(POINTER(c_float))
+    packet._payload = samples
+    return packet
+
+
+def wait_for_subscribers(server: rpw.PacketStreamServer, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(server.get_stats()["subscribers"]) < count:
+        assert time.monotonic() < deadline, "subscribers did not connect"
+        time.sleep(0.01)
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def address(request, tmp_path):
+    if request.param == "tcp":
+        return ("127.0.0.1", 0)
+    return str(tmp_path / "stream.sock")
+
+
+def test_multiple_subscribers_receive_all_packets(address):
+    rng = np.random.default_rng(0)
+    sent = [rng.normal(size=(100 + i, 2)).astype(np.float32) for i in range(10)]
+    with rpw.PacketStreamServer(None, address) as server:
+        with rpw.PacketStreamClient(server.address(), timeout=5) as c1, \
+             rpw.PacketStreamClient(server.address(), timeout=5) as c2:
+            wait_for_subscribers(server, 2)
+            for i, samples in enumerate(sent):
+                server.publish(make_packet(samples, i))
+            for client in (c1, c2):
+                for i, samples in enumerate(sent):
+                    packet = client.get_packet()
+                    assert packet.streamID == i
+                    assert packet.startFrequency == 100e6
+                    np.testing.assert_array_equal(packet.get_sample_as_ndarray(), samples)
+            stats = server.get_stats()
+            assert stats["packetsIn"] == len(sent)
+    if isinstance(address, str):
+        assert not os.path.exists(address)
+
+
+@pytest.mark.parametrize("sample_format, tolerance", [
+    (rpw.AARTSAAPI_Wrapper_SampleFormat.INT16, 1e-4),
+    (rpw.AARTSAAPI_Wrapper_SampleFormat.INT8, 2e-2),
+])
+def test_quantized_formats(address, sample_format, tolerance):
+    rng = np.random.default_rng(1)
+    sent = [rng.normal(size=(n, 2)).astype(np.float32) for n in (100, 0, 13)]
+    with rpw.PacketStreamServer(None, address, sample_format=sample_format, scale_block=7) as server:
+        with rpw.PacketStreamClient(server.address(), timeout=5) as client:
+            wait_for_subscribers(server, 1)
+            for samples in sent:
+                server.publish(make_packet(samples))
+            for samples in sent:
+                received = client.get_packet().get_sample_as_ndarray()
+                assert received.shape == samples.shape
+                np.testing.assert_allclose(received, samples, atol=tolerance)
+
+
+@pytest.mark.parametrize("drop_policy", list(rpw.AARTSAAPI_Wrapper_StreamDropPolicy))
+def test_drop_policy(drop_policy):
+    # large packets fill the socket buffers, so the queue of the idle subscriber overflows
+    samples = np.zeros((1 << 19, 2), dtype=np.float32)
+    count = 40
+    with rpw.PacketStreamServer(None, ("127.0.0.1", 0), queue_size=2, drop_policy=drop_policy) as server:
+        with rpw.PacketStreamClient(server.address(), timeout=5) as client:
+            wait_for_subscribers(server, 1)
+            for i in range(count):
+                server.publish(make_packet(samples, i))
+            dropped = server.get_stats()["subscribers"][0]["packetsDropped"]
+            assert dropped > 0
+            received = [client.get_packet().streamID for _ in range(count - dropped)]
+    assert received == sorted(received)
+    if drop_policy == rpw.AARTSAAPI_Wrapper_StreamDropPolicy.DROP_OLDEST:
+        assert received[-1] == count - 1
+    else:
+        assert received[0] == 0
+        assert received[-1] < count - 1
+
+
+def test_unix_socket_keeps_other_files(tmp_path):
+    path = tmp_path / "stream.sock"
+    path.write_text("not a socket")
+    with pytest.raises(OSError):
+        with rpw.PacketStreamServer(None, str(path)):
+            pass
+    assert path.read_text() == "not a socket"
+
+
+def test_unix_socket_replaces_stale_socket(tmp_path):
+    path = str(tmp_path / "stream.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+    with rpw.PacketStreamServer(None, path) as server:
+        with rpw.PacketStreamClient(server.address(), timeout=5):
+            wait_for_subscribers(server, 1)
+    assert not os.path.exists(path)
+
+
+class FakeDevice:
+    def __init__(self, error=None) -> None:
+        self.error = error
+
+    def start(self) -> None:
+        pass
+
+    def poll_packet(self, callback, channel=0) -> bool:
+        if self.error is not None:
+            raise self.error
+        return False
+
+
+def test_idle_device_does_not_block_exit():
+    with rpw.PacketStreamServer(FakeDevice(), ("127.0.0.1", 0)) as server:
+        time.sleep(0.05)
+        assert server.get_stats()["packetsIn"] == 0
+
+
+def test_acquisition_error_is_raised():
+    server = rpw.PacketStreamServer(FakeDevice(RuntimeError("device lost")), ("127.0.0.1", 0))
+    with pytest.raises(RuntimeError, match="device lost"):
+        with server:
+            time.sleep(0.05)
+            server.get_stats()